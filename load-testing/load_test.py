@@ -2,174 +2,496 @@
 """
 Simple Load Testing Script
 Usage: python load_test.py
+
+The module is fully annotated so it can be compiled with mypyc
+(see README.md); the compiled build is started with
+python -c "import load_test; load_test.main()".
 """
 
 import requests
 import time
 import threading
 import os
+import signal
+import ssl
+import array
+import ctypes
+import itertools
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Union
 import multiprocessing as mp
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
-import statistics
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import asyncio
-import aiohttp
+import httpx
+import numpy as np
+import urllib3
+from requests.adapters import HTTPAdapter
+
+try:
+    import rloop  # type: ignore[import-not-found]  # Optional: Rust event loop built on mio
+except ImportError:
+    rloop = None
+
+try:
+    import uvloop  # libuv-based event loop (Linux/macOS)
+except ImportError:
+    uvloop = None  # type: ignore[assignment]
 
 # Auto-detect optimal settings based on system
-CPU_CORES = os.cpu_count()
+CPU_CORES = os.cpu_count() or 1
 OPTIMAL_THREADS = CPU_CORES * 4  # 4x cores is often optimal for I/O bound tasks
 
 # Configuration
 URL = "https://bb-basic-test-865238481351.europe-west1.run.app/"  # Change this to your target URL
 NUM_REQUESTS = 20000  # Increased for high-performance systems
 CONCURRENT_THREADS = min(OPTIMAL_THREADS, 120)  # Cap at 120 to avoid overwhelming
+NUM_PROCESSES = min(CPU_CORES, CONCURRENT_THREADS)  # Worker processes, each with its own GIL and share of the connections
 USE_ASYNC = True  # Use async for even better performance
+USE_RLOOP = False  # Opt in to the experimental rloop event loop for the async test (needs `pip install rloop`)
+HTTP2 = True  # Multiplex async requests over HTTP/2 (falls back to HTTP/1.1 if the server lacks h2)
 TIMEOUT = 10  # seconds
-RUN_DURATION = 0  # seconds; 0 means no time limit
+VERIFY_TLS = True  # Set to False to skip certificate checks (benchmark only, never for real traffic)
+RUN_DURATION: float = 0  # seconds; 0 means no time limit
 
-print(f"System detected: {CPU_CORES} CPU cores")
-print(f"Optimal threads calculated: {CONCURRENT_THREADS}")
+# Per-process HTTP session for the threaded test so connections are kept alive
+# and reused across requests instead of paying a TCP/TLS handshake each time
+SESSION = requests.Session()
+adapter = HTTPAdapter(pool_connections=CONCURRENT_THREADS, pool_maxsize=CONCURRENT_THREADS, max_retries=0)
+SESSION.mount("https://", adapter)
+SESSION.mount("http://", adapter)
+if not VERIFY_TLS:
+    # urllib3 would otherwise emit an InsecureRequestWarning on every request
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# Global variables to store results (thread-safe)
-results = []
-errors = []
-results_lock = threading.Lock()
+def async_tls_verify() -> Union[bool, ssl.SSLContext]:
+    """Return the httpx verify setting: True, or an SSL context that skips certificate checks"""
+    if VERIFY_TLS:
+        return True
+    ssl_ctx = ssl.create_default_context()
+    ssl_ctx.check_hostname = False
+    ssl_ctx.verify_mode = ssl.CERT_NONE
+    return ssl_ctx
 
-async def make_async_request(session, semaphore):
-    """Make an async HTTP request with semaphore for concurrency control"""
-    async with semaphore:
-        try:
-            start_time = time.time()
-            async with session.get(URL, timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as response:
-                await response.text()  # Read response body
-                end_time = time.time()
-                
-                response_time = (end_time - start_time) * 1000  # Convert to milliseconds
-                
-                # Store result (thread-safe)
-                result = {
-                    'status_code': response.status,
-                    'response_time': response_time,
-                    'success': response.status == 200
-                }
-                
-                with results_lock:
-                    results.append(result)
-                    if len(results) % 2000 == 0:
-                        print(f"Request {len(results)}: {response.status} - {response_time:.2f}ms")
+# Results are kept as parallel arrays indexed by request number. Numbers are
+# handed out with next(request_index), which is atomic under the GIL, so each
+# request owns its slot and no lock is needed to record a result. Slots of
+# failed or never-issued requests keep status 0 and are skipped when reporting.
+# Inside a worker process the arrays are views of its slice of the parent's
+# shared memory (see worker_result_slots), so results are never pickled.
+response_times: Union["array.array[int]", memoryview] = array.array('q')  # microseconds
+status_codes: Union["array.array[int]", memoryview] = array.array('i')
+request_index = itertools.count()
+errors: list[str] = []
 
-        except Exception as e:
-            with results_lock:
-                errors.append(str(e))
-                print(f"Error: {e}")
+# Shared per-process completed and failed counts, written by each worker
+# process's reporter and summed by the parent, and the perf_counter() time each
+# worker started its timed window (0 until then; see init_worker_process)
+process_progress: Optional["ctypes.Array[ctypes.c_longlong]"] = None
+process_errors: Optional["ctypes.Array[ctypes.c_longlong]"] = None
+process_started: Optional["ctypes.Array[ctypes.c_double]"] = None
+# Set by the parent on Ctrl+C so every worker stops taking new requests. A raw
+# shared bool rather than an mp.Event: it is read before every request, and
+# reading it takes no lock.
+stop_requested: Optional[ctypes.c_bool] = None
+
+# Signature shared by run_async_process and run_threaded_process, which return
+# the (start, end) of their timed window, the warmup error if any, and errors
+ProcessResult = tuple[float, float, Optional[str], list[str]]
+ProcessTarget = Callable[[int, str, float, tuple[str, str], int, int, int], ProcessResult]
+
+def record_result(i: int, status_code: int, response_time: int) -> None:
+    """Store the outcome of request number i in its slot"""
+    response_times[i] = response_time
+    status_codes[i] = status_code
+
+def completed_requests() -> int:
+    """Number of requests finished so far (recorded results plus errors)"""
+    # Unused slots still hold status 0, so this needs no shared counter
+    return int(np.count_nonzero(np.frombuffer(status_codes, dtype=np.intc))) + len(errors)
+
+def request_counts() -> tuple[int, int]:
+    """Return (finished, failed) request counts for this process"""
+    return completed_requests(), len(errors)
 
-def make_request():
-    """Make a single HTTP request and record the response time (sync version)"""
+def split_evenly(total: int, parts: int) -> list[int]:
+    """Split total into a list of parts integers that differ by at most one"""
+    base, extra = divmod(total, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+def report_progress(start_time: float, completed: int, new_errors: int) -> None:
+    """Print a one-line progress summary"""
+    elapsed = time.perf_counter() - start_time
+    line = f"Progress: {completed}/{NUM_REQUESTS} requests - {completed / elapsed:.2f} req/s"
+    if new_errors:
+        line += f" - {new_errors} errors since last report"
+    print(line)
+
+# Workers publish often enough that the parent's once-per-second report is not
+# skewed by stale counts; counting this process's slots is cheap
+PUBLISH_INTERVAL = 0.1  # seconds
+
+async def async_reporter(progress: "ctypes.Array[ctypes.c_longlong]", error_counts: "ctypes.Array[ctypes.c_longlong]", slot: int) -> None:
+    """Publish this process's finished and failed counts every PUBLISH_INTERVAL until cancelled"""
+    while True:
+        await asyncio.sleep(PUBLISH_INTERVAL)
+        progress[slot], error_counts[slot] = request_counts()
+
+def thread_publisher(stop: threading.Event, progress: "ctypes.Array[ctypes.c_longlong]", error_counts: "ctypes.Array[ctypes.c_longlong]", slot: int) -> None:
+    """Publish this process's finished and failed counts every PUBLISH_INTERVAL until stop is set"""
+    while not stop.wait(PUBLISH_INTERVAL):
+        progress[slot], error_counts[slot] = request_counts()
+
+def thread_reporter(stop: threading.Event, get_start: Callable[[], Optional[float]], get_counts: Callable[[], tuple[int, int]]) -> None:
+    """Report progress and new errors once per second, from when get_start returns a time until stop is set"""
+    start_time = get_start()
+    while start_time is None:
+        if stop.wait(PUBLISH_INTERVAL):
+            return
+        start_time = get_start()
+    reported_errors = 0
+    while not stop.wait(1.0):
+        completed, failed = get_counts()
+        report_progress(start_time, completed, failed - reported_errors)
+        reported_errors = failed
+
+def preferred_event_loop() -> str:
+    """Name the event loop to use: rloop if opted in, then uvloop, then asyncio's default"""
+    if USE_RLOOP and rloop is not None:
+        return "rloop"
+    if uvloop is not None:
+        return "uvloop"
+    return "asyncio"
+
+def install_event_loop() -> None:
+    """Install the preferred event loop policy for this process"""
+    loop = preferred_event_loop()
+    if loop == "rloop":
+        asyncio.set_event_loop_policy(rloop.EventLoopPolicy())
+    elif loop == "uvloop":
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+async def make_async_request(client: httpx.AsyncClient, url: httpx.URL, i: int) -> None:
+    """Make async request number i and record the response time"""
     try:
-        start_time = time.time()
-        response = requests.get(URL, timeout=TIMEOUT)
-        end_time = time.time()
+        start_time = time.perf_counter_ns()
+        # get() reads the whole body as raw bytes and frees the connection;
+        # response.text is never touched, so nothing is decoded
+        response = await client.get(url)
+        end_time = time.perf_counter_ns()
         
-        response_time = (end_time - start_time) * 1000  # Convert to milliseconds
+        response_time = (end_time - start_time) // 1000  # Convert to microseconds
         
-        # Store result (thread-safe)
-        result = {
-            'status_code': response.status_code,
-            'response_time': response_time,
-            'success': response.status_code == 200
-        }
+        record_result(i, response.status_code, response_time)
+
+    except Exception as e:
+        # Printing here would put a blocking write on every failure; the
+        # reporter summarises new errors once per second instead
+        errors.append(str(e))
+
+def claim_request(num_requests: int, start_time: float, stop: ctypes.c_bool) -> Optional[int]:
+    """Return the next request number to issue, or None once num_requests are taken, RUN_DURATION is reached or stop is set"""
+    if stop.value or (RUN_DURATION and (time.perf_counter() - start_time) >= RUN_DURATION):
+        return None
+    i = next(request_index)
+    return i if i < num_requests else None
+
+async def async_worker(client: httpx.AsyncClient, url: httpx.URL, num_requests: int, start_time: float, stop: ctypes.c_bool) -> None:
+    """Issue requests back to back for as long as claim_request hands out numbers"""
+    while (i := claim_request(num_requests, start_time, stop)) is not None:
+        await make_async_request(client, url, i)
+
+def prepare_sync_request() -> tuple[requests.PreparedRequest, dict[str, Any]]:
+    """Build the threaded test's GET request and its send() settings once"""
+    request = SESSION.prepare_request(requests.Request("GET", URL))
+    # Session.get would re-prepare the request and re-read proxy and CA bundle
+    # settings from the environment on every call; resolve them upfront instead.
+    # verify is passed explicitly: with None, REQUESTS_CA_BUNDLE or CURL_CA_BUNDLE
+    # would override VERIFY_TLS = False.
+    send_kwargs: dict[str, Any] = {
+        **SESSION.merge_environment_settings(request.url, {}, None, VERIFY_TLS, None),
+        "timeout": TIMEOUT,
+    }
+    return request, send_kwargs
+
+def make_request(request: requests.PreparedRequest, send_kwargs: dict[str, Any], i: int) -> None:
+    """Make request number i and record the response time (sync version)"""
+    try:
+        start_time = time.perf_counter_ns()
+        response = SESSION.send(request, **send_kwargs)
+        response.content  # Drain body so the connection goes back to the pool
+        end_time = time.perf_counter_ns()
+        
+        response_time = (end_time - start_time) // 1000  # Convert to microseconds
         
-        with results_lock:
-            results.append(result)
-            print(f"Request {len(results)}: {response.status_code} - {response_time:.2f}ms")
+        record_result(i, response.status_code, response_time)
         
     except Exception as e:
-        with results_lock:
-            errors.append(str(e))
-            print(f"Error: {e}")
+        errors.append(str(e))
+
+def thread_worker(request: requests.PreparedRequest, send_kwargs: dict[str, Any], num_requests: int, start_time: float, stop: ctypes.c_bool) -> None:
+    """Issue requests back to back for as long as claim_request hands out numbers (sync version)"""
+    while (i := claim_request(num_requests, start_time, stop)) is not None:
+        make_request(request, send_kwargs, i)
+
+def init_worker_process(progress: "ctypes.Array[ctypes.c_longlong]", error_counts: "ctypes.Array[ctypes.c_longlong]", started: "ctypes.Array[ctypes.c_double]", stop: ctypes.c_bool) -> None:
+    """ProcessPoolExecutor initializer that shares the parent's progress counters and stop flag"""
+    global process_progress, process_errors, process_started, stop_requested
+    # Ctrl+C goes to the whole process group; only the parent handles it and
+    # tells the workers to finish through the stop flag
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    process_progress, process_errors, process_started, stop_requested = progress, error_counts, started, stop
+
+def worker_counters() -> tuple["ctypes.Array[ctypes.c_longlong]", "ctypes.Array[ctypes.c_longlong]", "ctypes.Array[ctypes.c_double]"]:
+    """Return the shared (progress, error_counts, started) counters installed by init_worker_process"""
+    assert process_progress is not None and process_errors is not None and process_started is not None, "init_worker_process must run first"
+    return process_progress, process_errors, process_started
+
+def worker_stop_flag() -> ctypes.c_bool:
+    """Return the shared stop flag installed by init_worker_process"""
+    assert stop_requested is not None, "init_worker_process must run first"
+    return stop_requested
+
+# Both modes send one untimed warmup request before calling begin_timed_window,
+# so DNS resolution and the TLS handshake stay out of the measurements. A warmup
+# failure is returned to the parent, which reports it once for all processes.
+def begin_timed_window(slot: int) -> float:
+    """Publish the start of this process's timed window for the parent's reporter and return it"""
+    _, _, started = worker_counters()
+    start_time = started[slot] = time.perf_counter()
+    return start_time
+
+@contextmanager
+def worker_result_slots(url: str, run_duration: float, shm_names: tuple[str, str], offset: int, num_requests: int) -> Iterator[None]:
+    """Apply the parent's settings and point the result arrays at this process's slice of shared memory"""
+    global URL, RUN_DURATION, response_times, status_codes, request_index, errors
+    URL, RUN_DURATION = url, run_duration
+    times_shm = shared_memory.SharedMemory(name=shm_names[0])
+    codes_shm = shared_memory.SharedMemory(name=shm_names[1])
+    times_buf, codes_buf = times_shm.buf, codes_shm.buf
+    assert times_buf is not None and codes_buf is not None
+    times_size, codes_size = array.array('q').itemsize, array.array('i').itemsize
+    times_view = times_buf[offset * times_size:(offset + num_requests) * times_size].cast('q')
+    codes_view = codes_buf[offset * codes_size:(offset + num_requests) * codes_size].cast('i')
+    response_times, status_codes = times_view, codes_view
+    request_index = itertools.count()
+    errors = []
+    try:
+        yield
+    finally:
+        # The views must be released before the shared memory can be closed
+        response_times, status_codes = array.array('q'), array.array('i')
+        times_view.release()
+        codes_view.release()
+        times_shm.close()
+        codes_shm.close()
+
+async def run_async_chunk(slot: int, num_requests: int, concurrency: int) -> tuple[float, float, Optional[str]]:
+    """Run num_requests requests on this process's event loop and return the timed (start, end) and warmup error"""
+    progress, error_counts, _ = worker_counters()
+    
+    # The client limits are the only connection gate: client.get waits inside
+    # httpx for a free connection when the pool is saturated. With HTTP/2 many
+    # in-flight requests share each connection as separate streams.
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    # Parse the target once; the timeout is configured on the client, so no
+    # per-request objects are built for either
+    url = httpx.URL(URL)
+    async with httpx.AsyncClient(http2=HTTP2, limits=limits, timeout=TIMEOUT, verify=async_tls_verify()) as client:
+        warmup_error = None  # see begin_timed_window
+        try:
+            await client.get(url)
+        except Exception as e:
+            warmup_error = str(e)
+        
+        start_time = begin_timed_window(slot)
+        reporter = asyncio.create_task(async_reporter(progress, error_counts, slot))
+        
+        # A fixed pool of workers bounds concurrency and keeps memory flat
+        # instead of creating one task per request upfront
+        stop = worker_stop_flag()
+        workers = [asyncio.create_task(async_worker(client, url, num_requests, start_time, stop)) for _ in range(concurrency)]
+        await asyncio.gather(*workers)
+        
+        end_time = time.perf_counter()
+        reporter.cancel()
+    
+    progress[slot], error_counts[slot] = request_counts()
+    return start_time, end_time, warmup_error
+
+def run_async_process(slot: int, url: str, run_duration: float, shm_names: tuple[str, str], offset: int, num_requests: int, concurrency: int) -> ProcessResult:
+    """Run one asyncio event loop in a worker process and return its timed window, warmup error and errors"""
+    with worker_result_slots(url, run_duration, shm_names, offset, num_requests):
+        install_event_loop()
+        start_time, end_time, warmup_error = asyncio.run(run_async_chunk(slot, num_requests, concurrency))
+        return start_time, end_time, warmup_error, errors
+
+def run_threaded_process(slot: int, url: str, run_duration: float, shm_names: tuple[str, str], offset: int, num_requests: int, concurrency: int) -> ProcessResult:
+    """Run a thread pool in a worker process and return its timed window, warmup error and errors"""
+    with worker_result_slots(url, run_duration, shm_names, offset, num_requests):
+        progress, error_counts, _ = worker_counters()
+        request, send_kwargs = prepare_sync_request()
+        
+        warmup_error = None  # see begin_timed_window
+        try:
+            SESSION.send(request, **send_kwargs).content
+        except Exception as e:
+            warmup_error = str(e)
+        
+        start_time = begin_timed_window(slot)
+        stop_publisher = threading.Event()
+        publisher = threading.Thread(target=thread_publisher, args=(stop_publisher, progress, error_counts, slot), daemon=True)
+        publisher.start()
+        
+        # A fixed pool of long-lived workers keeps `concurrency` requests in
+        # flight instead of queueing one future per request upfront
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            stop = worker_stop_flag()
+            futures = [executor.submit(thread_worker, request, send_kwargs, num_requests, start_time, stop) for _ in range(concurrency)]
+            for future in futures:
+                future.result()
+        
+        end_time = time.perf_counter()
+        stop_publisher.set()
+        publisher.join()
+        
+        progress[slot], error_counts[slot] = request_counts()
+        return start_time, end_time, warmup_error, errors
 
-async def run_async_load_test():
-    """Run the load test using async/await for maximum performance"""
+def read_shared_results(times_shm: shared_memory.SharedMemory, codes_shm: shared_memory.SharedMemory) -> tuple[np.ndarray, np.ndarray]:
+    """Copy the recorded (response_times, status_codes) slots out of the shared result blocks"""
+    codes = np.ndarray(NUM_REQUESTS, dtype=np.intc, buffer=codes_shm.buf)
+    times = np.ndarray(NUM_REQUESTS, dtype=np.int64, buffer=times_shm.buf)
+    recorded = codes != 0
+    # Boolean indexing copies, so the results outlive the shared memory
+    return times[recorded], codes[recorded]
+
+def worker_process_count() -> int:
+    """Number of worker processes to run: NUM_PROCESSES, capped so every process gets at least one connection and one request"""
+    return min(NUM_PROCESSES, CONCURRENT_THREADS, max(1, NUM_REQUESTS))
+
+def run_in_processes(target: ProcessTarget) -> tuple[float, np.ndarray, np.ndarray, list[str]]:
+    """Run target in worker_process_count() processes and return (total_time, response_times, status_codes, errors)"""
+    # Requests and concurrency are spread evenly so the totals match the configuration
+    processes = worker_process_count()
+    request_chunks = split_evenly(NUM_REQUESTS, processes)
+    concurrency_chunks = split_evenly(CONCURRENT_THREADS, processes)
+    offsets = itertools.accumulate(request_chunks, initial=0)
+    progress = mp.RawArray('q', processes)
+    error_counts = mp.RawArray('q', processes)
+    started = mp.RawArray('d', processes)
+    stop = mp.RawValue(ctypes.c_bool, False)
+    
+    # Each process writes results straight into its slice of these blocks.
+    # New shared memory is zero-filled, so every slot starts at status 0.
+    times_shm = shared_memory.SharedMemory(create=True, size=max(1, NUM_REQUESTS * array.array('q').itemsize))
+    codes_shm = shared_memory.SharedMemory(create=True, size=max(1, NUM_REQUESTS * array.array('i').itemsize))
+    shm_names = (times_shm.name, codes_shm.name)
+    try:
+        # Rates are measured from the first worker's timed window, not from
+        # before the processes were spawned and warmed up
+        def first_start() -> Optional[float]:
+            return min((t for t in started if t), default=None)
+        
+        with ProcessPoolExecutor(max_workers=processes, initializer=init_worker_process, initargs=(progress, error_counts, started, stop)) as executor:
+            futures = [
+                executor.submit(target, slot, URL, RUN_DURATION, shm_names, offset, num_requests, concurrency)
+                for slot, (offset, num_requests, concurrency) in enumerate(zip(offsets, request_chunks, concurrency_chunks))
+            ]
+            
+            # Submitting has spawned every worker, so the reporter thread is
+            # started only now; forking a multi-threaded parent can deadlock a
+            # child that inherits a lock held by another thread (e.g. stdout's)
+            stop_reporter = threading.Event()
+            reporter = threading.Thread(target=thread_reporter, args=(stop_reporter, first_start, lambda: (sum(progress), sum(error_counts))), daemon=True)
+            reporter.start()
+            
+            # Collect each process's errors as soon as it finishes
+            start_times = []
+            end_times = []
+            warmup_errors: Counter[str] = Counter()
+            all_errors = []
+            try:
+                for future in as_completed(futures):
+                    chunk_start, chunk_end, warmup_error, chunk_errors = future.result()
+                    start_times.append(chunk_start)
+                    end_times.append(chunk_end)
+                    if warmup_error is not None:
+                        warmup_errors[warmup_error] += 1
+                    all_errors += chunk_errors
+            except KeyboardInterrupt:
+                # Workers ignore SIGINT; let them finish their in-flight
+                # requests and exit instead of sending the rest of their chunk
+                stop.value = True
+                executor.shutdown(cancel_futures=True)
+                raise
+            finally:
+                stop_reporter.set()
+                reporter.join()
+        
+        times, codes = read_shared_results(times_shm, codes_shm)
+        # Each process starts its clock after its own startup and warmup, so
+        # the windows are staggered; perf_counter is monotonic and system-wide
+        # on Linux, so the run spans from the first start to the last end
+        total_time = max(end_times) - min(start_times)
+    finally:
+        times_shm.close()
+        times_shm.unlink()
+        codes_shm.close()
+        codes_shm.unlink()
+    
+    for error, count in warmup_errors.items():
+        print(f"Warmup request failed in {count} of {processes} processes: {error}")
+    
+    if RUN_DURATION and total_time >= RUN_DURATION:
+        print(f"Run duration {RUN_DURATION}s reached, stopped issuing new requests.")
+    
+    return total_time, times, codes, all_errors
+
+def run_async_load_test() -> None:
+    """Run the load test using one asyncio event loop per CPU core for maximum performance"""
     print(f"Starting ASYNC load test...")
     print(f"URL: {URL}")
     print(f"Total requests: {NUM_REQUESTS}")
     print(f"Concurrent connections: {CONCURRENT_THREADS}")
+    print(f"Processes: {worker_process_count()}")
+    print(f"Event loop: {preferred_event_loop()}")
+    print(f"HTTP/2: {'enabled' if HTTP2 else 'disabled'}")
+    print(f"TLS verification: {'enabled' if VERIFY_TLS else 'DISABLED (benchmark only)'}")
     print("-" * 50)
     
-    start_time = time.time()
-    
-    # Create semaphore to limit concurrent connections
-    semaphore = asyncio.Semaphore(CONCURRENT_THREADS)
-    
-    # Create aiohttp session
-    connector = aiohttp.TCPConnector(limit=CONCURRENT_THREADS, limit_per_host=CONCURRENT_THREADS)
-    async with aiohttp.ClientSession(connector=connector) as session:
-        # Schedule tasks but stop scheduling when RUN_DURATION is exceeded (if set)
-        tasks = []
-        for i in range(NUM_REQUESTS):
-            if RUN_DURATION and (time.time() - start_time) >= RUN_DURATION:
-                print(f"Run duration {RUN_DURATION}s reached, stopping scheduling new requests (scheduled {len(tasks)} requests).")
-                break
-            # create task that will respect the semaphore
-            tasks.append(asyncio.create_task(make_async_request(session, semaphore)))
-            # yield occasionally to the event loop to avoid starvation
-            if i % 100 == 0:
-                await asyncio.sleep(0)
-
-        # Run scheduled tasks (if any)
-        if tasks:
-            await asyncio.gather(*tasks)
-        else:
-            print("No tasks were scheduled due to run duration limit.")
-    
-    end_time = time.time()
-    total_time = end_time - start_time
-    
     # Calculate statistics
-    print_results(total_time)
+    print_results(*run_in_processes(run_async_process))
 
-def run_load_test():
-    """Run the load test with multiple threads (sync version)"""
+def run_load_test() -> None:
+    """Run the load test with a thread pool in each worker process (sync version)"""
     print(f"Starting THREADED load test...")
     print(f"URL: {URL}")
     print(f"Total requests: {NUM_REQUESTS}")
     print(f"Concurrent threads: {CONCURRENT_THREADS}")
+    print(f"Processes: {worker_process_count()}")
+    print(f"TLS verification: {'enabled' if VERIFY_TLS else 'DISABLED (benchmark only)'}")
     print("-" * 50)
     
-    start_time = time.time()
-    
-    # Use ThreadPoolExecutor to manage concurrent requests
-    with ThreadPoolExecutor(max_workers=CONCURRENT_THREADS) as executor:
-        futures = []
-        for i in range(NUM_REQUESTS):
-            if RUN_DURATION and (time.time() - start_time) >= RUN_DURATION:
-                print(f"Run duration {RUN_DURATION}s reached, stopping scheduling new requests (scheduled {len(futures)} requests).")
-                break
-            futures.append(executor.submit(make_request))
-
-        # Wait for all scheduled requests to complete
-        for future in futures:
-            future.result()
-    
-    end_time = time.time()
-    total_time = end_time - start_time
-    
     # Calculate statistics
-    print_results(total_time)
+    print_results(*run_in_processes(run_threaded_process))
 
-def print_results(total_time):
-    """Print test results and statistics"""
+def print_results(total_time: float, times: np.ndarray, codes: np.ndarray, error_list: list[str]) -> None:
+    """Print test results and statistics (times in µs and codes are numpy arrays, one entry per recorded request)"""
     print("\n" + "=" * 50)
     print("LOAD TEST RESULTS")
     print("=" * 50)
     
-    if not results:
+    successful_requests = len(times)
+    if not successful_requests:
         print("No successful requests!")
+        print_errors(error_list)
         return
     
     # Basic stats
-    total_requests = len(results) + len(errors)
-    successful_requests = len(results)
-    failed_requests = len(errors)
+    total_requests = successful_requests + len(error_list)
+    failed_requests = len(error_list)
     
     print(f"Total requests: {total_requests}")
     print(f"Successful requests: {successful_requests}")
@@ -179,33 +501,34 @@ def print_results(total_time):
     print(f"Requests per second: {total_requests/total_time:.2f}")
     print(f"CPU utilization: ~{(CONCURRENT_THREADS/CPU_CORES)*100:.1f}% of available cores")
     
-    # Response time statistics
-    response_times = [r['response_time'] for r in results]
-    if response_times:
-        print(f"\nResponse Time Statistics:")
-        print(f"Average: {statistics.mean(response_times):.2f}ms")
-        print(f"Median: {statistics.median(response_times):.2f}ms")
-        print(f"Min: {min(response_times):.2f}ms")
-        print(f"Max: {max(response_times):.2f}ms")
+    # Response time statistics (vectorized)
+    times_ms = times / 1000  # Convert to milliseconds
+    print(f"\nResponse Time Statistics:")
+    print(f"Average: {np.mean(times_ms):.2f}ms")
+    print(f"Median: {np.median(times_ms):.2f}ms")
+    print(f"Min: {np.min(times_ms):.2f}ms")
+    print(f"Max: {np.max(times_ms):.2f}ms")
     
     # Status code breakdown
-    status_codes = {}
-    for result in results:
-        code = result['status_code']
-        status_codes[code] = status_codes.get(code, 0) + 1
+    # Counted in numpy so no Python object is created per request
+    unique_codes, code_counts = np.unique(codes, return_counts=True)
     
     print(f"\nStatus Code Breakdown:")
-    for code, count in status_codes.items():
+    for code, count in zip(unique_codes.tolist(), code_counts.tolist()):
         print(f"  {code}: {count} requests")
     
-    # Show errors if any
-    if errors:
+    print_errors(error_list)
+
+def print_errors(error_list: list[str]) -> None:
+    """Print each distinct error message with how often it occurred"""
+    if error_list:
         print(f"\nErrors:")
-        for error in set(errors):  # Remove duplicates
-            count = errors.count(error)
+        for error, count in Counter(error_list).items():
             print(f"  {error}: {count} times")
 
-if __name__ == "__main__":
+def main() -> None:
+    """Prompt for the target and mode, then run the load test"""
+    global URL, RUN_DURATION, USE_ASYNC
     print("High-Performance Load Testing Script")
     print(f"System: {CPU_CORES} CPU cores detected")
     print(f"Optimized for: {CONCURRENT_THREADS} concurrent connections")
@@ -240,8 +563,11 @@ if __name__ == "__main__":
             run_load_test()
         else:
             USE_ASYNC = True
-            asyncio.run(run_async_load_test())
+            run_async_load_test()
     except KeyboardInterrupt:
         print("\nTest interrupted by user")
     except Exception as e:
         print(f"Test failed: {e}")
+
+if __name__ == "__main__":
+    main()